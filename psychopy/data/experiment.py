@@ -219,6 +219,27 @@ class ExperimentHandler(_ComparisonMixin):
             value = copy.deepcopy(value)
         self.thisEntry[name] = value
 
+    def addDataMany(self, data):
+        """Add several pieces of data (a dict of name: value) to the current
+        experiment at once. This is equivalent to calling
+        addData(name, value) for each item, but faster for many items.
+
+        e.g.::
+
+            exp.addDataMany({'mouse.x': [0.1, 0.2], 'mouse.y': [0.3, 0.4]})
+        """
+        dataNames = self.dataNames
+        thisEntry = self.thisEntry
+        for name, value in data.items():
+            if name not in dataNames:
+                dataNames.append(name)
+            # as in addData, copy mutable values
+            try:
+                hash(value)
+            except TypeError:
+                value = copy.deepcopy(value)
+            thisEntry[name] = value
+
     def nextEntry(self):
         """Calling nextEntry indicates to the ExperimentHandler that the
         current trial has ended and so further addData() calls correspond
@@ -738,6 +738,15 @@ class TrialHandler(_BaseTrialHandler):
         if self.getExp() != None:  # update the experiment handler too
             self.getExp().addData(thisType, value)
 
+    def addDataMany(self, data):
+        """Add several pieces of data (a dict of type: value) for the
+        current trial at once
+        """
+        for thisType, value in data.items():
+            self.data.add(thisType, value, position=None)
+        if self.getExp() != None:  # update the experiment handler too
+            self.getExp().addDataMany(data)
+
 
 class TrialHandler2(_BaseTrialHandler):
     """Class to handle trial sequencing and data storage.
@@ -1183,6 +1192,20 @@ class TrialHandler2(_BaseTrialHandler):
             # update the experiment handler too
             self.getExp().addData(thisType, value)
 
+    def addDataMany(self, data):
+        """Add several pieces of data (a dict of type: value) to the
+        current trial at once
+        """
+        for thisType in data:
+            # store in the columns list to help ordering later
+            if thisType not in self.columns:
+                self.columns.append(thisType)
+        # save the actual values in the data dict
+        self.thisTrial.update(data)
+        if self.getExp() is not None:
+            # update the experiment handler too
+            self.getExp().addDataMany(data)
+
 
 class TrialHandlerExt(TrialHandler):
     """A class for handling trial sequences in a *non-counterbalanced design*
@@ -1553,7 +1576,7 @@ class TrialHandlerExt(TrialHandler):
                 self.data['ran'][firstRowIndex:lastRowIndex, :])
 
             _tw = self.trialWeights[self.thisIndex]
-            dataRowThisTrial = firstRowIndex + (nThisTrialPresented - 1) % _tw
+            dataRowThisTrial = int(firstRowIndex + (nThisTrialPresented - 1) % _tw)
             dataColThisTrial = int(old_div((nThisTrialPresented - 1), _tw))
 
             position = [dataRowThisTrial, dataColThisTrial]
@@ -1583,7 +1606,7 @@ class TrialHandlerExt(TrialHandler):
                 self.data['ran'][firstRowIndex:lastRowIndex, :])
 
             _tw = self.trialWeights[self.thisIndex]
-            dataRowThisTrial = firstRowIndex + nThisTrialPresented % _tw
+            dataRowThisTrial = int(firstRowIndex + nThisTrialPresented % _tw)
             dataColThisTrial = int(old_div(nThisTrialPresented, _tw))
 
             position = [dataRowThisTrial, dataColThisTrial]
@@ -1604,6 +1627,21 @@ class TrialHandlerExt(TrialHandler):
             # update the experiment handler too:
             self.getExp().addData(thisType, value)
 
+    def addDataMany(self, data):
+        """Add several pieces of data (a dict of type: value) for the
+        current trial at once
+        """
+        # all the data go to the same position for this trial
+        if self.trialWeights is None:
+            pos = None
+        else:
+            pos = self.getCurrentTrialPosInDataHandler()
+        for thisType, value in data.items():
+            self.data.add(thisType, value, position=pos)
+        if self.getExp() is not None:
+            # update the experiment handler too:
+            self.getExp().addDataMany(data)
+
     def _createOutputArrayData(self, dataOut):
         """This just creates the dataOut part of the output matrix.
         It is called by _createOutputArray() which creates the header
@@ -91,6 +91,9 @@ if havePyglet or haveGLFW:
     # container for time elapsed from last reset of mouseClick[n] for any
     # button pressed
     mouseTimes = [0.0, 0.0, 0.0]
+    # time (psychopy.core.getTime()) at which the window received the latest
+    # mouse button press, None until there is one
+    mousePressTime = None
     # clock for tracking time of mouse movement, reset when mouse is moved,
     # reset on mouse motion:
     mouseMove = psychopy.core.Clock()
@@ -259,8 +262,9 @@ def _onPygletMousePress(x, y, button, modifiers, emulated=False):
     """button left=1, middle=2, right=4;
     specify multiple buttons with | operator
     """
-    global mouseButtons, mouseClick, mouseTimes
+    global mouseButtons, mouseClick, mouseTimes, mousePressTime
     now = psychopy.clock.getTime()
+    mousePressTime = now
     if emulated:
         label = 'Emulated'
     else:
@@ -658,16 +662,26 @@ class Mouse(object):
                 w = defDisplay.get_windows()[0]
 
             # get position in window
-            lastPosPix = numpy.array([w._mouse_x, w._mouse_y])
-            # set (0,0) to centre
-            if self.win.useRetina:
-                lastPosPix = lastPosPix*2 - numpy.array(self.win.size) / 2
-            else:
-                lastPosPix = lastPosPix - numpy.array(self.win.size) / 2
+            self.lastPos = self.eventPosToUnits(w._mouse_x, w._mouse_y)
+            return copy.copy(self.lastPos)
         self.lastPos = self._pix2windowUnits(lastPosPix)
 
         return copy.copy(self.lastPos)
 
+    def eventPosToUnits(self, x, y):
+        """Converts the position given to a pyglet mouse event handler
+        (e.g. `on_mouse_press`), in pixels from the bottom left of the
+        window, to the units of the :class:`~visual.Window` with (0,0)
+        at centre, as from `getPos()`
+        """
+        pixPos = numpy.array([x, y])
+        # set (0,0) to centre
+        if self.win.useRetina:
+            pixPos = pixPos*2 - numpy.array(self.win.size) / 2
+        else:
+            pixPos = pixPos - numpy.array(self.win.size) / 2
+        return self._pix2windowUnits(pixPos)
+
     def mouseMoved(self, distance=None, reset=False):
         """Determine whether/how far the mouse has moved.
 
@@ -853,6 +867,28 @@ class Mouse(object):
             else:
                 return copy.copy(mouseButtons), copy.copy(mouseTimes)
 
+    def getLastPressTime(self, clock=None):
+        """Returns the time at which the window received the latest mouse
+        button press, or None if no press has been received (or the
+        pygame backend is in use).
+
+        This is the time the press event was handled, which is typically
+        earlier than when the press is seen by `getPressed()`. If a
+        :class:`~psychopy.core.Clock` is given the time is relative to
+        its last reset (as from `clock.getTime()`), so a press from before
+        that reset gives a negative time::
+
+            if mouse.getPressed()[0]:
+                rt = mouse.getLastPressTime(trialClock)
+                if rt is None or rt < 0:  # no press since the reset
+                    rt = trialClock.getTime()
+        """
+        if usePygame or mousePressTime is None:
+            return None
+        if clock is None:
+            return mousePressTime
+        return mousePressTime - clock.getLastResetTime()
+
     def isPressedIn(self, shape, buttons=(0, 1, 2)):
         """Returns `True` if the mouse is currently inside the shape and
         one of the mouse buttons is pressed. The default is that any of
@@ -1227,7 +1263,7 @@ def _onGLFWMouseButton(*args, **kwargs):
     handled by this function as they both invoke the same callback.
 
     """
-    global mouseButtons, mouseClick, mouseTimes
+    global mouseButtons, mouseClick, mouseTimes, mousePressTime
     now = psychopy.core.getTime()
     win_ptr, button, action, modifier = args
     # win = glfw.get_window_user_pointer(win_ptr)
@@ -1238,6 +1274,7 @@ def _onGLFWMouseButton(*args, **kwargs):
 
     # process actions
     if action == glfw.PRESS:
+        mousePressTime = now
         if button == glfw.MOUSE_BUTTON_LEFT:
             mouseButtons[0] = 1
             mouseTimes[0] = now - mouseClick[0].getLastResetTime()
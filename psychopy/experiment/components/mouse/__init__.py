@@ -9,21 +9,37 @@ from __future__ import absolute_import, print_function
 from builtins import super  # provides Py3-style super() using python-future
 
 from os import path
+from psychopy.constants import FOREVER
 from psychopy.experiment.components import BaseComponent, Param, _translate
+from psychopy.experiment import CodeGenerationException
 import re
 
 # the absolute path to the folder containing this path
 thisFolder = path.abspath(path.dirname(__file__))
 iconFile = path.join(thisFolder, 'mouse.png')
 tooltip = _translate('Mouse: query mouse position and buttons')
+_word_re = re.compile(r"[\w']+")  # splits the saveParamsClickable string
+# the choices for saveMouseColumns
+_mouseDataChoices = ['pos', 'buttons', 'time', 'clicked']
+
+
+def _indent(code, level, oneIndent="    "):
+    """Indent each line of code by level steps of oneIndent (as
+    IndentingBuffer.writeIndentedLines would at that level)
+    """
+    prefix = oneIndent * level
+    return ''.join(prefix + line + '\n' for line in code.splitlines())
+
 
 # only use _localized values for label values, nothing functional:
 _localized = {'saveMouseState': _translate('Save mouse state'),
+              'saveMouseColumns': _translate('Save mouse data'),
               'forceEndRoutineOnPress': _translate('End Routine on press'),
               'timeRelativeTo': _translate('Time relative to'),
               'Clickable stimuli': _translate('Clickable stimuli'),
               'Store params for clicked': _translate('Store params for clicked'),
-              'New clicks only': _translate('New clicks only')}
+              'New clicks only': _translate('New clicks only'),
+              'First hit only': _translate('First clicked stimulus only')}
 
 
 class MouseComponent(BaseComponent):
@@ -32,6 +48,9 @@ class MouseComponent(BaseComponent):
     """
     categories = ['Responses']
     targets = ['PsychoPy', 'PsychoJS']
+    # frame code templates, keyed by _frameTemplateKey()
+    _frameTemplates = {}
+    _frameTemplatesJS = {}
 
     def __init__(self, exp, parentName, name='mouse',
                  startType='time (s)', startVal=0.0,
@@ -52,20 +71,34 @@ class MouseComponent(BaseComponent):
 
         self.order += [
             'forceEndRoutineOnPress',
-            'saveMouseState', 'timeRelativeTo',
-            'newClicksOnly', 'clickable', 'saveParamsClickable']
+            'saveMouseState', 'saveMouseColumns', 'timeRelativeTo',
+            'newClicksOnly', 'clickable', 'saveParamsClickable',
+            'firstHitOnly']
 
         # params
         msg = _translate(
             "How often should the mouse state (x,y,buttons) be stored? "
             "On every video frame, every click or just at the end of the "
-            "Routine?")
+            "Routine? 'events' stores every press and release as it is "
+            "received by the window, rather than checking the buttons once "
+            "per frame (pyglet windows only).")
         self.params['saveMouseState'] = Param(
             save, valType='str',
-            allowedVals=['final', 'on click', 'every frame', 'never'],
+            allowedVals=['final', 'on click', 'every frame', 'events',
+                         'never'],
             hint=msg,
             label=_localized['saveMouseState'])
 
+        msg = _translate(
+            "Which of the mouse data to store: a comma-separated list of "
+            "pos, buttons, time and clicked (the params of the clicked "
+            "stimuli). e.g. just clicked, if only the clicked stimuli matter.")
+        self.params['saveMouseColumns'] = Param(
+            'pos, buttons, time, clicked', valType='code',
+            updates='constant', allowedUpdates=[],
+            hint=msg,
+            label=_localized['saveMouseColumns'])
+
         msg = _translate("Should a button press force the end of the routine"
                          " (e.g end the trial)?")
         if forceEndRoutineOnPress is True:
@@ -119,66 +152,169 @@ class MouseComponent(BaseComponent):
             hint=msg,
             label=_localized['Store params for clicked'])
 
+        msg = _translate('Stop checking the clickable stimuli at the first '
+                         'one (in the order listed) that contains the mouse, '
+                         'rather than storing the params of every stimulus '
+                         'under it.'
+                         )
+        self.params['firstHitOnly'] = Param(
+            True, valType='bool',
+            updates='constant',
+            hint=msg,
+            label=_localized['First hit only'])
+
+        # (saveParamsClickable val, list of param names) from the last parse
+        self._clickableParamsCache = (None, None)
 
     @property
     def _clickableParamsList(self):
-        # convert clickableParams (str) to a list
+        # convert clickableParams (str) to a list, reparsing only on change
         params = self.params['saveParamsClickable'].val
-        paramsList = re.findall(r"[\w']+", params)
-        return paramsList or ['name']
-
-    def _writeClickableObjectsCode(self, buff):
-        # code to check if clickable objects were clicked
-        code = (
-            "# check if the mouse was inside our 'clickable' objects\n"
+        if params == self._clickableParamsCache[0]:
+            return self._clickableParamsCache[1]
+        paramsList = _word_re.findall(params) or ['name']
+        self._clickableParamsCache = (params, paramsList)
+        return paramsList
+
+    def _dataChoices(self):
+        """The mouse data to store (pos, buttons, time and clicked), from
+        the saveMouseColumns param, which must not hold anything else (so
+        that a typo doesn't just leave that data out)
+        """
+        choices = _word_re.findall(self.params['saveMouseColumns'].val)
+        unknown = [choice for choice in choices if choice not in _mouseDataChoices]
+        if unknown:
+            raise CodeGenerationException(
+                self.params['name'],
+                "Unknown mouse data to save: {} (choose from {})".format(
+                    ', '.join(unknown), ', '.join(_mouseDataChoices)))
+        return choices
+
+    def _savedColumns(self):
+        """The names of the data columns (x, y, buttons and time) to store,
+        from the saveMouseColumns param
+        """
+        choices = self._dataChoices()
+        columns = []
+        if 'pos' in choices:
+            columns += ['x', 'y']
+        if 'buttons' in choices:
+            columns += ['leftButton', 'midButton', 'rightButton']
+        if 'time' in choices:
+            columns.append('time')
+        return columns
+
+    def _saveClicked(self):
+        """Whether to store the params of the clicked objects"""
+        return bool(self.params['clickable'].val and
+                    'clicked' in self._dataChoices())
+
+    def _clickableObjectsCode(self, getPos=True):
+        """Code (with %(name)s left to fill in) to check if clickable objects
+        were clicked. Set getPos=False if x, y already hold the position.
+        """
+        code = "# check if the mouse was inside our 'clickable' objects\n"
+        if getPos:
+            # fetch the position once rather than once per object
+            code += "x, y = %(name)s._getPos()\n"
+        code += (
             "gotValidClick = False\n"
-            "for obj in [%(clickable)s]:\n"
-            "    if obj.contains(%(name)s):\n"
+            "for obj in %(name)s._clickables:\n"
+            "    if obj.contains(x, y, units=%(name)s.units):\n"
             "        gotValidClick = True\n")
-        buff.writeIndentedLines(code % self.params)
-
-        buff.setIndentLevel(+2, relative=True)
-        code = ''
-        for paramName in self._clickableParamsList:
-            code += "%s.clicked_%s.append(obj.%s)\n" %(self.params['name'],
-                                                     paramName, paramName)
-        buff.writeIndentedLines(code % self.params)
-        buff.setIndentLevel(-2, relative=True)
+        if self._saveClicked():
+            code += (
+                "        for paramName in %(name)s._clickParamNames:\n"
+                "            %(name)s._clickedLists[paramName].append(getattr(obj, paramName))\n")
+        if self.params['firstHitOnly'].val:
+            code += "        break  # only store the first object clicked\n"
+        return code
 
-    def _writeClickableObjectsCodeJS(self, buff):
+    def _writeClickableObjectsCode(self, buff, getPos=True):
         # code to check if clickable objects were clicked
+        buff.writeIndentedLines(self._clickableObjectsCode(getPos)
+                                % self._strParams())
+
+    def _clickableObjectsCodeJS(self):
+        """Code (with %(name)s left to fill in) to check if clickable objects
+        were clicked
+        """
         code = (
             "// check if the mouse was inside our 'clickable' objects\n"
             "gotValidClick = false;\n"
-            "for (const obj of [{clickable}]) {{\n"
-            "  if (obj.contains({name})) {{\n"
+            "for (const obj of %(name)s._clickables) {\n"
+            "  if (obj.contains(%(name)s)) {\n"
             "    gotValidClick = true;\n")
-        buff.writeIndentedLines(code.format(name=self.params['name'],
-                                            clickable=self.params['clickable'].val))
-        buff.setIndentLevel(+2, relative=True)
-        dedent = 2
-        code = ''
-        for paramName in self._clickableParamsList:
-            code += "%s.clicked_%s.push(obj.%s)\n" % (self.params['name'],
-                                                        paramName, paramName)
+        if self._saveClicked():
+            for paramName in self._clickableParamsList:
+                code += ("    %%(name)s.clicked_%s.push(obj.%s);\n"
+                         % (paramName, paramName))
+        if self.params['firstHitOnly'].val:
+            code += "    break;  // only store the first object clicked\n"
+        code += ("  }\n"
+                 "}\n")
+        return code
 
-        buff.writeIndentedLines(code % self.params)
-        for dents in range(dedent):
-            buff.setIndentLevel(-1, relative=True)
-            buff.writeIndented('}\n')
+    def _writeClickableObjectsCodeJS(self, buff):
+        # code to check if clickable objects were clicked
+        buff.writeIndentedLines(self._clickableObjectsCodeJS()
+                                % self._strParams())
+
+    def _setClockStr(self):
+        # get a clock for timing
+        timeRelative = self.params['timeRelativeTo'].val.lower()
+        if timeRelative == 'experiment':
+            self.clockStr = 'globalClock'
+        elif timeRelative in ['routine', 'mouse onset']:
+            self.clockStr = '%s.mouseClock' % self.params['name'].val
+
+    def _strParams(self):
+        """The values to fill in to the code templates (%(name)s and
+        %(clockStr)s), converted to str once rather than on every use
+        """
+        self._setClockStr()
+        return {'name': str(self.params['name']), 'clockStr': self.clockStr}
 
     def writeInitCode(self, buff):
+        params = self._strParams()
         code = ("%(name)s = event.Mouse(win=win)\n"
                 "x, y = [None, None]\n"
                 "%(name)s.mouseClock = core.Clock()\n")
-        buff.writeIndentedLines(code % self.params)
+        if self._saveClicked():
+            # the params to store from the clicked objects
+            code += ("%(name)s._clickParamNames = ({},)\n".format(
+                ", ".join("'{}'".format(clickableObjParam)
+                          for clickableObjParam in self._clickableParamsList)))
+        buff.writeIndentedLines(code % params)
+
+        if self.params['saveMouseState'].val == 'events':
+            # queue presses and releases (and when they happened) as the
+            # window receives them while the mouse is started, for the frame
+            # code to collect, with the buttons held down after each one
+            code = ("if win.winType != 'pyglet':\n"
+                    "    raise RuntimeError(\"Mouse %(name)s saves 'events', which needs \"\n"
+                    "                       \"a pyglet window (not %%s)\" %% win.winType)\n"
+                    "from collections import deque\n"
+                    "%(name)s._events = deque()  # (pixel x, y, buttons down, time, is a press) of each\n"
+                    "%(name)s._eventButtons = 0  # buttons down (1 left, 2 middle, 4 right)\n"
+                    "def _%(name)s_onPress(x, y, button, modifiers):\n"
+                    "    %(name)s._eventButtons |= button\n"
+                    "    if %(name)s.status == STARTED:\n"
+                    "        %(name)s._events.append((x, y, %(name)s._eventButtons, %(clockStr)s.getTime(), True))\n"
+                    "def _%(name)s_onRelease(x, y, button, modifiers):\n"
+                    "    %(name)s._eventButtons &= ~button\n"
+                    "    if %(name)s.status == STARTED:\n"
+                    "        %(name)s._events.append((x, y, %(name)s._eventButtons, %(clockStr)s.getTime(), False))\n"
+                    "win.winHandle.push_handlers(on_mouse_press=_%(name)s_onPress,\n"
+                    "                            on_mouse_release=_%(name)s_onRelease)\n")
+            buff.writeIndentedLines(code % params)
 
     def writeInitCodeJS(self, buff):
         code = ("%(name)s = new core.Mouse({\n"
                 "  win: psychoJS.window,\n"
                 "});\n"
                 "%(name)s.mouseClock = new util.Clock();\n")
-        buff.writeIndentedLines(code % self.params)
+        buff.writeIndentedLines(code % self._strParams())
 
     def writeRoutineStartCode(self, buff):
         """Write the code that will be called at the start of the routine
@@ -187,284 +323,492 @@ class MouseComponent(BaseComponent):
         # we need more than one
         code = ("# setup some python lists for storing info about the "
                 "%(name)s\n")
-        if self.params['saveMouseState'].val in ['every frame', 'on click']:
-            code += ("%(name)s.x = []\n"
-                     "%(name)s.y = []\n"
-                     "%(name)s.leftButton = []\n"
-                     "%(name)s.midButton = []\n"
-                     "%(name)s.rightButton = []\n"
-                     "%(name)s.time = []\n")
+        columns = self._savedColumns()
+        if (self.params['saveMouseState'].val in ['every frame', 'on click',
+                                                  'events'] and columns):
+            # one list per column, appended to on each sample (cheaper per
+            # sample than storing into numpy arrays)
+            for colName in columns:
+                code += "%(name)s.{} = []\n".format(colName)
         if self.params['clickable'].val:
+            # build the collection of clickable objects once, not every frame
+            code += ("%(name)s._clickables = ({},)\n"
+                     .format(str(self.params['clickable']).rstrip(', ')))
+        if self._saveClicked():
+            # lists of the clicked objects' params, by param name (also
+            # available as clicked_<param>)
+            code += ("%(name)s._clickedLists = {{{}}}\n".format(
+                ", ".join("'{}': []".format(clickableObjParam)
+                          for clickableObjParam in self._clickableParamsList)))
             for clickableObjParam in self._clickableParamsList:
-                code += "%(name)s.clicked_{} = []\n".format(clickableObjParam)
+                code += ("%(name)s.clicked_{0} = %(name)s._clickedLists['{0}']\n"
+                         .format(clickableObjParam))
 
         code += "gotValidClick = False  # until a click is received\n"
 
         if self.params['timeRelativeTo'].val.lower() == 'routine':
             code += "%(name)s.mouseClock.reset()\n"
 
-        buff.writeIndentedLines(code % self.params)
+        if self._hasFrameCode():
+            # bind the methods called on each frame once per routine
+            code += ("%(name)s._getPos = %(name)s.getPos\n"
+                     "%(name)s._getPressed = %(name)s.getPressed\n"
+                     "%(name)s._getTime = %(clockStr)s.getTime\n")
+            # and the function called on each frame, if there is one
+            code += self._getFrameTemplates()[2]
+
+        buff.writeIndentedLines(code % self._strParams())
 
     def writeRoutineStartCodeJS(self, buff):
         """Write the code that will be called at the start of the routine"""
 
         code = ("// setup some python lists for storing info about the %(name)s\n")
-        if self.params['saveMouseState'].val in ['every frame', 'on click']:
-            code += ("// current position of the mouse:\n"
-                     "%(name)s.x = [];\n"
-                     "%(name)s.y = [];\n"
-                     "%(name)s.leftButton = [];\n"
-                     "%(name)s.midButton = [];\n"
-                     "%(name)s.rightButton = [];\n"
-                     "%(name)s.time = [];\n")
+        columns = self._savedColumns()
+        if (self.params['saveMouseState'].val in ['every frame', 'on click',
+                                                  'events'] and columns):
+            # preallocated typed arrays (one per column), doubled when full,
+            # with room for every frame of the mouse's duration if known (and
+            # the samples so far viewed as mouse.x etc.)
+            capacity = '256'
+            startTime, duration, nonSlipSafe = self.getStartAndDuration()
+            if (self.params['saveMouseState'].val == 'every frame'
+                    and duration is not None and duration < FOREVER):
+                capacity = ("Math.max(256, Math.ceil((expInfo['frameRate'] || 60) * %s))"
+                            % duration)
+            code += "%(name)s._n = 0;  // number of samples stored so far\n"
+            if 'x' in columns:
+                code += "// current position of the mouse:\n"
+            for colName in columns:
+                arrayType = 'Float64Array'
+                if colName.endswith('Button'):
+                    arrayType = 'Int8Array'
+                code += ("%(name)s._{} = new {}({});\n"
+                         .format(colName, arrayType, capacity))
+                # the other columns get the same length as the first
+                capacity = "%(name)s._{}.length".format(columns[0])
+            for colName in columns:
+                code += ("%(name)s.{0} = %(name)s._{0}.subarray(0, 0);\n"
+                         .format(colName))
 
         if self.params['clickable'].val:
+            # build the array of clickable objects once, not every frame
+            code += ("%%(name)s._clickables = [%s];\n"
+                     % self.params['clickable'].val)
+        if self._saveClicked():
             for clickableObjParam in self._clickableParamsList:
-                code += "%s.clicked_%s = [];\n" % (self.params['name'], clickableObjParam)
+                code += "%%(name)s.clicked_%s = [];\n" % clickableObjParam
         code += "gotValidClick = false; // until a click is received\n"
 
         if self.params['timeRelativeTo'].val.lower() == 'routine':
             code += "%(name)s.mouseClock.reset();\n"
 
-        buff.writeIndentedLines(code % self.params)
-
-    def writeFrameCode(self, buff):
-        """Write the code that will be called every frame"""
+        buff.writeIndentedLines(code % self._strParams())
 
+    def _hasFrameCode(self):
+        """Whether the mouse is checked on each frame, to store data as we
+        go (each frame or each click) or to end the routine on a click
+        """
+        store = self.params['saveMouseState'].val
+        if self.params['forceEndRoutineOnPress'].val != 'never':
+            return True
+        elif store == 'every frame':
+            return bool(self._savedColumns())
+        elif store == 'on click':
+            return bool(self._savedColumns()) or self._saveClicked()
+        return store == 'events'
+
+    def _frameTemplateKey(self):
+        """The params that the frame code depends on, apart from the name
+        (and clock) that are filled in for each component
+        """
+        clickable = bool(self.params['clickable'].val)
+        return (self.params['saveMouseState'].val,
+                self.params['forceEndRoutineOnPress'].val,
+                bool(self.params['newClicksOnly']),
+                self.params['timeRelativeTo'].val.lower(),
+                clickable and tuple(self._clickableParamsList),
+                clickable and bool(self.params['firstHitOnly'].val),
+                tuple(self._savedColumns()),
+                self._saveClicked())
+
+    def _buildFrameTemplates(self):
+        """Build the frame code, with %(name)s and %(clockStr)s left to fill
+        in, as (code for when the mouse starts, code for each frame)
+        """
         forceEnd = self.params['forceEndRoutineOnPress'].val
 
-        # get a clock for timing
-        timeRelative = self.params['timeRelativeTo'].val.lower()
-        if timeRelative == 'experiment':
-            self.clockStr = 'globalClock'
-        elif timeRelative in ['routine', 'mouse onset']:
-            self.clockStr = '%s.mouseClock' % self.params['name'].val
-
-        # only write code for cases where we are storing data as we go (each
-        # frame or each click)
-
-        # might not be saving clicks, but want it to force end of trial
-        if (self.params['saveMouseState'].val not in
-                ['every frame', 'on click'] and forceEnd == 'never'):
-            return
-
-        buff.writeIndented("# *%s* updates\n" % self.params['name'])
-
-        # writes an if statement to determine whether to draw etc
-        self.writeStartTestCode(buff)
-        code = ("%(name)s.status = STARTED\n")
+        code = "%(name)s.status = STARTED\n"
         if self.params['timeRelativeTo'].val.lower() == 'mouse onset':
             code += "%(name)s.mouseClock.reset()\n"
+        if (self.params['saveMouseState'].val == 'on click'
+                and 'time' in self._savedColumns()):
+            code += ("%(name)s._tOnset = %(name)s._getTime()"
+                     "  # presses from before this are not new\n")
 
-        if self.params['newClicksOnly']:
+        if self.params['saveMouseState'].val == 'events':
+            code += (
+                "%(name)s._events.clear()"
+                "  # ignore any presses from before the mouse started\n")
+        elif self.params['newClicksOnly']:
             code += (
-                "prevButtonState = %(name)s.getPressed()"
+                "buttons = %(name)s._getPressed()\n"
+                "prevButtonMask = buttons[0] | (buttons[1] << 1) | (buttons[2] << 2)"
                 "  # if button is down already this ISN'T a new click\n")
         else:
             code += (
-                "prevButtonState = [0, 0, 0]"
+                "prevButtonMask = 0"
                 "  # if now button is down we will treat as 'new' click\n")
-        buff.writeIndentedLines(code % self.params)
-
-        # to get out of the if statement
-        buff.setIndentLevel(-1, relative=True)
-
-        # test for stop (only if there was some setting for duration or stop)
-        if self.params['stopVal'].val not in ['', None, -1, 'None']:
-            # writes an if statement to determine whether to draw etc
-            self.writeStopTestCode(buff)
-            buff.writeIndented("%(name)s.status = FINISHED\n" % self.params)
-            # to get out of the if statement
-            buff.setIndentLevel(-2, relative=True)
+        startCode = code
 
+        # build the update code as one string, each block indented (by
+        # _indent) to the level it goes at under this test
         # if STARTED and not FINISHED!
-        code = ("if %(name)s.status == STARTED:  "
-                "# only update if started and not finished!\n") % self.params
-        buff.writeIndented(code)
-        buff.setIndentLevel(1, relative=True)  # to get out of if statement
-        dedentAtEnd = 1  # keep track of how far to dedent later
-
-        def _buttonPressCode(buff, dedent):
-            """Code compiler for mouse button events"""
-            code = ("buttons = %(name)s.getPressed()\n"
-                    "if buttons != prevButtonState:  # button state changed?")
-            buff.writeIndentedLines(code % self.params)
-            buff.setIndentLevel(1, relative=True)
-            dedent += 1
-            buff.writeIndented("prevButtonState = buttons\n")
-            code = ("if sum(buttons) > 0:  # state changed to a new click\n")
-            buff.writeIndentedLines(code % self.params)
-            buff.setIndentLevel(1, relative=True)
-            dedent += 1
-            if self.params['clickable'].val:
-                self._writeClickableObjectsCode(buff)
-            return buff, dedent
+        startedCode = ("if %(name)s.status == STARTED:  "
+                      "# only update if started and not finished!\n")
+        code = ''
+        # the 'every frame' update goes in a function (see below) that
+        # returns True to end the routine
+        inTick = self.params['saveMouseState'].val == 'every frame'
+        if inTick:
+            endStatement = "return True\n"
+        else:
+            endStatement = "continueRoutine = False\n"
+
+        clickable = bool(self.params['clickable'].val)
+
+        def _buttonPressCode(getButtons=True, getPos=clickable):
+            """Code compiler for mouse button events, returning the code and
+            the indent level for the code to run on a new click. Set
+            getButtons=False if buttons already holds this frame's buttons,
+            and getPos=False if x, y already hold the position (or it isn't
+            needed), so that each is only read once
+            """
+            # pack the buttons into the bits of one int so that a change of
+            # state, and which buttons are newly down, take one test each
+            code = ''
+            if getButtons:
+                code += "buttons = %(name)s._getPressed()\n"
+            code = _indent(
+                code +
+                "buttonMask = buttons[0] | (buttons[1] << 1) | (buttons[2] << 2)\n"
+                "if buttonMask != prevButtonMask:  # button state changed?\n"
+                "    newPresses = buttonMask & ~prevButtonMask\n"
+                "    prevButtonMask = buttonMask\n"
+                "    if newPresses:  # state changed to a new click\n", 1)
+            if getPos:
+                code += _indent("x, y = %(name)s._getPos()\n", 3)
+            if clickable:
+                code += _indent(self._clickableObjectsCode(getPos=False), 3)
+            return code, 3
+
+        # store one sample (in the lists of the saved columns)
+        columns = self._savedColumns()
+        colValues = {'x': 'x', 'y': 'y', 'leftButton': 'buttons[0]',
+                     'midButton': 'buttons[1]', 'rightButton': 'buttons[2]',
+                     'time': '{time}'}
+        storeCode = ''.join("%(name)s.{}.append({})\n".format(colName, colValues[colName])
+                            for colName in columns)
+        validEndCode = ("if gotValidClick:  # abort routine on response\n"
+                        "    " + endStatement)
+        anyEndCode = ("# abort routine on response\n" +
+                      endStatement)
 
         # No mouse tracking, end routine on any or valid click
         if self.params['saveMouseState'].val == 'never' and forceEnd in ['any click', 'valid click']:
-            buff, dedentAtEnd = _buttonPressCode(buff, dedentAtEnd)
-
+            pressCode, level = _buttonPressCode()
+            code += pressCode
             if forceEnd == 'valid click':
-                    # does valid response end the trial?
-                    code = ("if gotValidClick:  # abort routine on response\n"
-                            "    continueRoutine = False\n")
-                    buff.writeIndentedLines(code)
-                    buff.setIndentLevel(-dedentAtEnd, relative=True)
+                # does valid response end the trial?
+                code += _indent(validEndCode, level)
             else:
-                buff.writeIndented('continueRoutine = False')
-                buff.setIndentLevel(-dedentAtEnd, relative=True)
+                code += _indent(endStatement, level)
+
+        elif self.params['saveMouseState'].val == 'events':
+            # collect the presses and releases queued since the last frame
+            code += _indent(
+                "while %(name)s._events:  # presses and releases queued by the window\n"
+                "    xPix, yPix, buttonMask, tEvent, isPress = %(name)s._events.popleft()\n", 1)
+            if 'x' in columns or self.params['clickable'].val:
+                code += _indent("x, y = %(name)s.eventPosToUnits(xPix, yPix)\n", 2)
+            if 'leftButton' in columns:
+                code += _indent("buttons = [buttonMask & 1, (buttonMask >> 1) & 1, (buttonMask >> 2) & 1]\n", 2)
+            # only a press is a click (and when only one click is saved,
+            # only the presses are stored)
+            pressCode = ''
+            if forceEnd == 'never':
+                code += _indent(storeCode.format(time='tEvent'), 2)
+            else:
+                pressCode += storeCode.format(time='tEvent')
+            if self.params['clickable'].val:
+                pressCode += self._clickableObjectsCode(getPos=False)
+                if forceEnd == 'valid click':
+                    pressCode += validEndCode
+            if forceEnd == 'any click':
+                pressCode += anyEndCode
+            if pressCode:
+                code += _indent("if isPress:\n", 2) + _indent(pressCode, 3)
 
         elif self.params['saveMouseState'].val != 'never':
-            mouseCode = ("x, y = {name}.getPos()\n"
-                    "{name}.x.append(x)\n"
-                    "{name}.y.append(y)\n"
-                    "buttons = {name}.getPressed()\n"
-                    "{name}.leftButton.append(buttons[0])\n"
-                    "{name}.midButton.append(buttons[1])\n"
-                    "{name}.rightButton.append(buttons[2])\n"
-                    "{name}.time.append({clockStr}.getTime())\n".format(name=self.params['name'],
-                                                                        clockStr=self.clockStr))
+            # (on a click, the press code reads the buttons and position)
+            mouseCode = ''
+            if 'time' not in columns:
+                mouseCode += storeCode
+            elif self.params['saveMouseState'].val == 'on click':
+                # use the time the window received the press, if known,
+                # rather than when this code gets to it (but not a press
+                # from before the mouse started, e.g. a button held down)
+                mouseCode += ("tPress = %(name)s.getLastPressTime(%(clockStr)s)\n"
+                              "if tPress is None or tPress < %(name)s._tOnset:\n"
+                              "    tPress = %(name)s._getTime()\n" +
+                              storeCode.format(time='tPress'))
+            else:
+                mouseCode += storeCode.format(time='%(name)s._getTime()')
 
             # Continuous mouse tracking
             if self.params['saveMouseState'].val in ['every frame']:
-                buff.writeIndentedLines(mouseCode)
+                readCode = ''
+                if 'x' in columns:
+                    readCode += "x, y = %(name)s._getPos()\n"
+                if 'leftButton' in columns:
+                    readCode += "buttons = %(name)s._getPressed()\n"
+                code += _indent(readCode + mouseCode, 1)
+                # a click reuses the buttons and position read for the frame
+                pressArgs = {'getButtons': 'leftButton' not in columns,
+                             'getPos': clickable and 'x' not in columns}
+            else:
+                pressArgs = {'getPos': clickable or 'x' in columns}
 
             # Continuous mouse tracking for all button press
             if forceEnd == 'never' and self.params['saveMouseState'].val in ['on click']:
-                buff, dedentAtEnd = _buttonPressCode(buff, dedentAtEnd)
-                buff.writeIndentedLines(mouseCode)
+                pressCode, level = _buttonPressCode(**pressArgs)
+                code += pressCode + _indent(mouseCode, level)
 
             # Mouse tracking for events that end routine
             elif forceEnd in ['any click', 'valid click']:
-                buff, dedentAtEnd = _buttonPressCode(buff, dedentAtEnd)
+                pressCode, level = _buttonPressCode(**pressArgs)
+                code += pressCode
                 # Save all mouse events on button press
                 if self.params['saveMouseState'].val in ['on click']:
-                    buff.writeIndentedLines(mouseCode)
-                # also write code about clicked objects if needed.
-                if self.params['clickable'].val:
-                    # does valid response end the trial?
-                    if forceEnd == 'valid click':
-                        code = ("if gotValidClick:  # abort routine on response\n"
-                                "    continueRoutine = False\n")
-                        buff.writeIndentedLines(code)
+                    code += _indent(mouseCode, level)
+                # does valid response end the trial?
+                if self.params['clickable'].val and forceEnd == 'valid click':
+                    code += _indent(validEndCode, level)
                 # does any response end the trial?
                 if forceEnd == 'any click':
-                    code = ("# abort routine on response\n"
-                            "continueRoutine = False\n")
-                    buff.writeIndentedLines(code)
-                else:
-                    pass # forceEnd == 'never'
-                # 'if' statement of the time test and button check
-            buff.setIndentLevel(-dedentAtEnd, relative=True)
+                    code += _indent(anyEndCode, level)
+                # (no columns to save and nothing to check)
+                if code.endswith(pressCode):
+                    code += _indent("pass\n", level)
+
+        tickCode = ''
+        if inTick:
+            # the update runs on every frame so put it in a function, defined
+            # at routine start, where the mouse (used most) and buttonMask,
+            # newPresses are fast locals rather than module-level names; the
+            # variables that the module level code used to set (and code
+            # components may read) are still set directly as globals, as
+            # copying them from locals once per frame costs more than it saves
+            globalNames = [varName for varName in
+                           ['x', 'y', 'buttons', 'prevButtonMask', 'gotValidClick']
+                           if re.search(r"\b%s\b" % varName, code)]
+            tickCode = ("def _%(name)s_tick(%(name)s=%(name)s):\n"
+                        "    # check %(name)s for this frame, returning True "
+                        "to end the routine\n")
+            if globalNames:
+                tickCode += "    global {}\n".format(', '.join(globalNames))
+            tickCode += code
+            tickCode += "%(name)s._tick = _%(name)s_tick\n"
+            # and call it on each frame
+            frameCode = startedCode
+            if (forceEnd == 'any click' or
+                    (forceEnd == 'valid click' and self.params['clickable'].val)):
+                frameCode += ("    if %(name)s._tick():\n"
+                              "        continueRoutine = False\n")
+            else:
+                frameCode += "    %(name)s._tick()\n"
+        else:
+            frameCode = startedCode + code
 
-    def writeFrameCodeJS(self, buff):
+        return startCode, frameCode, tickCode
+
+    def _getFrameTemplates(self):
+        """The (start, frame, tick) code templates for these params, built
+        the first time they are needed
+        """
+        key = self._frameTemplateKey()
+        if key not in self._frameTemplates:
+            self._frameTemplates[key] = self._buildFrameTemplates()
+        return self._frameTemplates[key]
+
+    def writeFrameCode(self, buff):
         """Write the code that will be called every frame"""
-        forceEnd = self.params['forceEndRoutineOnPress'].val
 
-        # get a clock for timing
-        timeRelative = self.params['timeRelativeTo'].val.lower()
-        if timeRelative == 'experiment':
-            self.clockStr = 'globalClock'
-        elif timeRelative in ['routine', 'mouse onset']:
-            self.clockStr = '%s.mouseClock' % self.params['name'].val
         # only write code for cases where we are storing data as we go (each
-        # frame or each click)
-
-        # might not be saving clicks, but want it to force end of trial
-        if (self.params['saveMouseState'].val not in
-                ['every frame', 'on click'] and forceEnd == 'never'):
+        # frame or each click) or might want to force end of trial
+        if not self._hasFrameCode():
             return
-        buff.writeIndented("// *%s* updates\n" % self.params['name'])
+
+        # the code only differs between mouse components by name and clock
+        # for a given set of params, so build it once and fill those in
+        startCode, frameCode, tickCode = self._getFrameTemplates()
+        params = self._strParams()
+
+        buff.writeIndented("# *%(name)s* updates\n" % params)
 
         # writes an if statement to determine whether to draw etc
-        self.writeStartTestCodeJS(buff)
+        self.writeStartTestCode(buff)
+        buff.writeIndentedLines(startCode % params)
+
+        # to get out of the if statement
+        buff.setIndentLevel(-1, relative=True)
+
+        # test for stop (only if there was some setting for duration or stop)
+        if self.params['stopVal'].val not in ['', None, -1, 'None']:
+            # writes an if statement to determine whether to draw etc
+            self.writeStopTestCode(buff)
+            buff.writeIndented("%(name)s.status = FINISHED\n" % params)
+            # to get out of the if statement
+            buff.setIndentLevel(-2, relative=True)
+
+        buff.writeIndentedLines(frameCode % params)
+
+    def _buildFrameTemplatesJS(self, oneIndent):
+        """Build the frame code, with %(name)s and %(clockStr)s left to fill
+        in, as (code for when the mouse starts, code for each frame), with
+        blocks indented by oneIndent
+        """
+        forceEnd = self.params['forceEndRoutineOnPress'].val
+        columns = self._savedColumns()
+
         code = "%(name)s.status = PsychoJS.Status.STARTED;\n"
         if self.params['timeRelativeTo'].val.lower() == 'mouse onset':
-            code += "%(name)s.mouseClock.reset();\n" % self.params
+            code += "%(name)s.mouseClock.reset();\n"
 
         if self.params['newClicksOnly']:
             code += (
-                "prevButtonState = %(name)s.getPressed();"
+                "const buttons = %(name)s.getPressed();\n"
+                "prevButtonMask = buttons[0] | (buttons[1] << 1) | (buttons[2] << 2);"
                 "  // if button is down already this ISN'T a new click\n")
         else:
             code += (
-                "prevButtonState = [0, 0, 0];"
+                "prevButtonMask = 0;"
                 "  // if now button is down we will treat as 'new' click\n")
         code+=("}\n")
-        buff.writeIndentedLines(code % self.params)
-
-        # to get out of the if statement
-        buff.setIndentLevel(-1, relative=True)
-
-        # test for stop (only if there was some setting for duration or stop)
-        if self.params['stopVal'].val not in ['', None, -1, 'None']:
-            # writes an if statement to determine whether to draw etc
-            self.writeStopTestCodeJS(buff)
-            buff.writeIndented("%(name)s.status = PsychoJS.Status.FINISHED;\n"
-                               "  }\n" % self.params)
-            # to get out of the if statement
-            buff.setIndentLevel(-1, relative=True)
+        startCode = code
 
+        # build the update code as one string (as in _buildFrameTemplates)
         # if STARTED and not FINISHED!
         code = ("if (%(name)s.status === PsychoJS.Status.STARTED) {  "
                 "// only update if started and not finished!\n")
-        buff.writeIndented(code % self.params)
-        buff.setIndentLevel(1, relative=True)  # to get out of if statement
-        dedentAtEnd = 1  # keep track of how far to dedent later
+        level = 1  # of the code inside the open blocks
 
         # write param checking code
-        if (self.params['saveMouseState'].val == 'on click'
+        # (PsychoJS has no queue of window events so 'events' is checked
+        # for new clicks on each frame, as for 'on click')
+        if (self.params['saveMouseState'].val in ['on click', 'events']
                 or forceEnd in ['any click', 'valid click']):
-            code = ("let buttons = %(name)s.getPressed();\n")
-            buff.writeIndentedLines(code % self.params)
-            # buff.setIndentLevel(1, relative=True)
-            # dedentAtEnd += 1
-            code = "if (!buttons.every( (e,i,) => (e == prevButtonState[i]) )) { // button state changed?\n"
-            buff.writeIndented(code)
-            buff.setIndentLevel(1, relative=True)
-            dedentAtEnd += 1
-            buff.writeIndented("prevButtonState = buttons;\n")
-            code = ("if (buttons.reduce( (e, acc) => (e+acc) ) > 0) { // state changed to a new click\n")
-            buff.writeIndentedLines(code % self.params)
-            buff.setIndentLevel(1, relative=True)
-            dedentAtEnd += 1
-
-        elif self.params['saveMouseState'].val == 'every frame':
-            code = "let buttons = %(name)s.getPressed();\n" % self.params
-            buff.writeIndented(code)
+            # buttons packed into the bits of one int (see writeFrameCode)
+            code += _indent(
+                "let buttons = %(name)s.getPressed();\n"
+                "const buttonMask = buttons[0] | (buttons[1] << 1) | (buttons[2] << 2);\n"
+                "if (buttonMask !== prevButtonMask) { // button state changed?\n"
+                "  const newPresses = buttonMask & ~prevButtonMask;\n"
+                "  prevButtonMask = buttonMask;\n"
+                "  if (newPresses) { // state changed to a new click\n", 1,
+                oneIndent)
+            level = 3
+
+        elif (self.params['saveMouseState'].val == 'every frame'
+                and 'leftButton' in columns):
+            code += _indent("let buttons = %(name)s.getPressed();\n", 1,
+                            oneIndent)
 
         # only do this if buttons were pressed
-        if self.params['saveMouseState'].val in ['on click', 'every frame']:
-            code = ("const xys = %(name)s.getPos();\n"
-                    "%(name)s.x.push(xys[0]);\n"
-                    "%(name)s.y.push(xys[1]);\n"
-                    "%(name)s.leftButton.push(buttons[0]);\n"
-                    "%(name)s.midButton.push(buttons[1]);\n"
-                    "%(name)s.rightButton.push(buttons[2]);\n" %
-                    self.params)
-            code += ("%s.time.push(%s.getTime());\n" % (self.params['name'], self.clockStr))
-            buff.writeIndentedLines(code)
+        if (self.params['saveMouseState'].val in ['on click', 'every frame',
+                                                  'events'] and columns):
+            storeCode = ''
+            if 'x' in columns:
+                storeCode += "const xys = %(name)s.getPos();\n"
+            storeCode += ("if (%(name)s._n === %(name)s._{}.length) {{"
+                          "  // buffers are full so double them\n"
+                          .format(columns[0]))
+            # one statement per column (no loop over computed property names)
+            # to keep the function simple for the JIT
+            for colName in columns:
+                arrayType = 'Float64Array'
+                if colName.endswith('Button'):
+                    arrayType = 'Int8Array'
+                storeCode += ("  const {col}Grown = new {type}(2 * %(name)s._n);\n"
+                              "  {col}Grown.set(%(name)s._{col});\n"
+                              "  %(name)s._{col} = {col}Grown;\n"
+                              .format(col=colName, type=arrayType))
+            storeCode += "}\n"
+            colValues = {'x': 'xys[0]', 'y': 'xys[1]',
+                         'leftButton': 'buttons[0]', 'midButton': 'buttons[1]',
+                         'rightButton': 'buttons[2]',
+                         'time': '%(clockStr)s.getTime()'}
+            for colName in columns:
+                storeCode += ("%(name)s._{0}[%(name)s._n] = {1};\n"
+                              .format(colName, colValues[colName]))
+            storeCode += "%(name)s._n += 1;\n"
+            for colName in columns:
+                storeCode += ("%(name)s.{0} = %(name)s._{0}.subarray(0, %(name)s._n);\n"
+                              .format(colName))
+            code += _indent(storeCode, level, oneIndent)
 
         # also write code about clicked objects if needed.
         if self.params['clickable'].val:
-            self._writeClickableObjectsCodeJS(buff)
+            code += _indent(self._clickableObjectsCodeJS(), level, oneIndent)
 
-            # does the response end the trial?
+        # does the response end the trial?
         if forceEnd == 'any click':
-            code = ("// abort routine on response\n"
-                    "continueRoutine = false;\n")
-            buff.writeIndentedLines(code)
+            code += _indent("// abort routine on response\n"
+                            "continueRoutine = false;\n", level, oneIndent)
 
         elif forceEnd == 'valid click':
-            code = ("if (gotValidClick === true) { // abort routine on response\n"
-                    "  continueRoutine = false;\n"
-                    "}\n")
-            buff.writeIndentedLines(code)
-        else:
-            pass  # forceEnd == 'never'
-        for thisDedent in range(dedentAtEnd):
+            code += _indent("if (gotValidClick === true) { // abort routine on response\n"
+                            "  continueRoutine = false;\n"
+                            "}\n", level, oneIndent)
+        # close the open blocks
+        for closeLevel in range(level - 1, -1, -1):
+            code += _indent("}\n", closeLevel, oneIndent)
+
+        return startCode, code
+
+    def writeFrameCodeJS(self, buff):
+        """Write the code that will be called every frame"""
+        # only write code for cases where we are storing data as we go (each
+        # frame or each click) or might want to force end of trial
+        if not self._hasFrameCode():
+            return
+
+        # build the code once for each set of params (see writeFrameCode)
+        # and indent unit
+        key = self._frameTemplateKey() + (buff.oneIndent,)
+        if key not in self._frameTemplatesJS:
+            self._frameTemplatesJS[key] = self._buildFrameTemplatesJS(buff.oneIndent)
+        startCode, frameCode = self._frameTemplatesJS[key]
+        params = self._strParams()
+
+        buff.writeIndented("// *%(name)s* updates\n" % params)
+
+        # writes an if statement to determine whether to draw etc
+        self.writeStartTestCodeJS(buff)
+        buff.writeIndentedLines(startCode % params)
+
+        # to get out of the if statement
+        buff.setIndentLevel(-1, relative=True)
+
+        # test for stop (only if there was some setting for duration or stop)
+        if self.params['stopVal'].val not in ['', None, -1, 'None']:
+            # writes an if statement to determine whether to draw etc
+            self.writeStopTestCodeJS(buff)
+            buff.writeIndented("%(name)s.status = PsychoJS.Status.FINISHED;\n" % params)
+            # to get out of the if statement
             buff.setIndentLevel(-1, relative=True)
-            buff.writeIndentedLines('}')
+            buff.writeIndented("}\n")
+
+        buff.writeIndentedLines(frameCode % params)
 
     def writeRoutineEndCode(self, buff):
         # some shortcuts
@@ -490,6 +834,7 @@ class MouseComponent(BaseComponent):
 
         buff.writeIndentedLines(code)
 
+        columns = self._savedColumns()
         if store == 'final':  # for the o
             # buff.writeIndented("# get info about the %(name)s\n"
             # %(self.params))
@@ -498,29 +843,35 @@ class MouseComponent(BaseComponent):
             # also write code about clicked objects if needed.
             buff.writeIndentedLines(code)
             if self.params['clickable'].val:
-                buff.writeIndented("if sum(buttons):\n")
+                buff.writeIndented("if buttons[0] or buttons[1] or buttons[2]:\n")
                 buff.setIndentLevel(+1, relative=True)
-                self._writeClickableObjectsCode(buff)
+                self._writeClickableObjectsCode(buff, getPos=False)
                 buff.setIndentLevel(-1, relative=True)
 
             if currLoop.type != 'StairHandler':
-                code = (
-                    "{loopName}.addData('{name}.x', x)\n" 
-                    "{loopName}.addData('{name}.y', y)\n" 
-                    "{loopName}.addData('{name}.leftButton', buttons[0])\n" 
-                    "{loopName}.addData('{name}.midButton', buttons[1])\n" 
-                    "{loopName}.addData('{name}.rightButton', buttons[2])\n"
-                )
-                buff.writeIndentedLines(
-                    code.format(loopName=currLoop.params['name'],
-                                name=name))
+                code = ''
+                if 'x' in columns:
+                    code += (
+                        "{loopName}.addData('{name}.x', x)\n" 
+                        "{loopName}.addData('{name}.y', y)\n"
+                    )
+                if 'leftButton' in columns:
+                    code += (
+                        "{loopName}.addData('{name}.leftButton', buttons[0])\n" 
+                        "{loopName}.addData('{name}.midButton', buttons[1])\n" 
+                        "{loopName}.addData('{name}.rightButton', buttons[2])\n"
+                    )
+                if code:
+                    buff.writeIndentedLines(
+                        code.format(loopName=currLoop.params['name'],
+                                    name=name))
                 # then add `trials.addData('mouse.clicked_name',.....)`
-                if self.params['clickable'].val:
+                if self._saveClicked():
                     for paramName in self._clickableParamsList:
                         code = (
-                            "if len({name}.clicked_{param}):\n"
-                            "    {loopName}.addData('{name}.clicked_{param}', " 
-                            "{name}.clicked_{param}[0])\n"
+                            "if len({name}._clickedLists['{param}']):\n"
+                            "    {loopName}.addData('{name}.clicked_{param}', "
+                            "{name}._clickedLists['{param}'][0])\n"
                         )
                         buff.writeIndentedLines(
                             code.format(loopName=currLoop.params['name'],
@@ -529,27 +880,49 @@ class MouseComponent(BaseComponent):
 
         elif store != 'never':
             # buff.writeIndented("# save %(name)s data\n" %(self.params))
-            mouseDataProps = ['x', 'y', 'leftButton', 'midButton',
-                             'rightButton', 'time']
+            mouseDataProps = columns
+            saveLists = store == 'every frame' or forceEnd == "never"
+            # the (data name, value) pairs to store
+            if saveLists:
+                valueCode = "{name}.{prop}"
+            else:
+                # we only had one click so don't return a list
+                valueCode = "{name}.{prop}[0]"
+            items = [("{name}.{prop}".format(name=name, prop=property),
+                      valueCode.format(name=name, prop=property))
+                     for property in mouseDataProps]
             # possibly add clicked params if we have clickable objects
-            if self.params['clickable'].val:
-                for paramName in self._clickableParamsList:
-                    mouseDataProps.append("clicked_{}".format(paramName))
-            # use that set of properties to create set of addData commands
-            for property in mouseDataProps:
-                if store == 'every frame' or forceEnd == "never":
-                    code = ("%s.addData('%s.%s', %s.%s)\n" %
-                            (currLoop.params['name'], name,
-                             property, name, property))
-                    buff.writeIndented(code)
-                else:
-                    # we only had one click so don't return a list
-                    code = ("if len(%s.%s): %s.addData('%s.%s', %s.%s[0])\n" %
-                            (name, property,
-                             currLoop.params['name'], name,
-                             property, name, property))
-                    buff.writeIndented(code)
-
+            clickedParams = []
+            if self._saveClicked():
+                clickedParams = self._clickableParamsList
+            if saveLists:
+                items += [("{name}.clicked_{param}".format(name=name, param=paramName),
+                           "{name}._clickedLists['{param}']".format(name=name, param=paramName))
+                          for paramName in clickedParams]
+                clickedParams = []
+
+            if not items:
+                code = ''
+            elif currLoop.type in ['StairHandler', 'MultiStairHandler']:
+                # staircases have no addDataMany() so add them one by one
+                code = ''.join("{loopName}.addData('%s', %s)\n" % item
+                               for item in items)
+            else:
+                # add them all in one call
+                code = ("{loopName}.addDataMany({{\n" +
+                        ''.join("    '%s': %s,\n" % item for item in items) +
+                        "}})\n")
+            if code and not saveLists:
+                code = ("if len({name}.%s):\n" % mouseDataProps[0] +
+                        ''.join("    " + line + "\n" for line in code.splitlines()))
+            for paramName in clickedParams:
+                code += ("if len({name}._clickedLists['%s']): "
+                         "{loopName}.addData('{name}.clicked_%s', "
+                         "{name}._clickedLists['%s'][0])\n"
+                         % (paramName, paramName, paramName))
+            if code:
+                buff.writeIndentedLines(code.format(loopName=currLoop.params['name'],
+                                                    name=name))
 
         # get parent to write code too (e.g. store onset/offset times)
         super().writeRoutineEndCode(buff)
@@ -582,23 +955,28 @@ class MouseComponent(BaseComponent):
 
         buff.writeIndentedLines(code)
 
+        columns = self._savedColumns()
         if store == 'final':
 
             code = ("const xys = {name}.getPos();\n"
                     "const buttons = {name}.getPressed();\n")
 
             if currLoop.type != 'StairHandler':
-                code += (
-                    "psychoJS.experiment.addData('{name}.x', xys[0]);\n"
-                    "psychoJS.experiment.addData('{name}.y', xys[1]);\n"
-                    "psychoJS.experiment.addData('{name}.leftButton', buttons[0]);\n"
-                    "psychoJS.experiment.addData('{name}.midButton', buttons[1]);\n"
-                    "psychoJS.experiment.addData('{name}.rightButton', buttons[2]);\n"
-                )
+                if 'x' in columns:
+                    code += (
+                        "psychoJS.experiment.addData('{name}.x', xys[0]);\n"
+                        "psychoJS.experiment.addData('{name}.y', xys[1]);\n"
+                    )
+                if 'leftButton' in columns:
+                    code += (
+                        "psychoJS.experiment.addData('{name}.leftButton', buttons[0]);\n"
+                        "psychoJS.experiment.addData('{name}.midButton', buttons[1]);\n"
+                        "psychoJS.experiment.addData('{name}.rightButton', buttons[2]);\n"
+                    )
                 buff.writeIndentedLines(code.format(name=name))
 
                 # For clicked objects...
-                if self.params['clickable'].val:
+                if self._saveClicked():
                     for paramName in self._clickableParamsList:
                         code = (
                             "if ({name}.clicked_{param}.length > 0) {{\n"
@@ -609,15 +987,26 @@ class MouseComponent(BaseComponent):
 
         elif store != 'never':
             # buff.writeIndented("# save %(name)s data\n" %(self.params))
-            mouseDataProps = ['x', 'y', 'leftButton', 'midButton',
-                              'rightButton', 'time']
+            mouseDataProps = list(columns)
             # possibly add clicked params if we have clickable objects
-            if self.params['clickable'].val:
+            if self._saveClicked():
                 for paramName in self._clickableParamsList:
                     mouseDataProps.append("clicked_{}".format(paramName))
             # use that set of properties to create set of addData commands
             for property in mouseDataProps:
-                if store == 'every frame' or forceEnd == "never":
+                if not property.startswith('clicked_'):
+                    # the samples as an array, as they were before the
+                    # typed arrays (of which only the first _n are used)
+                    code = ("{name}.{prop} = "
+                            "Array.from({name}._{prop}.subarray(0, {name}._n));\n")
+                    if store == 'every frame' or forceEnd == "never":
+                        code += ("psychoJS.experiment.addData('{name}.{prop}', "
+                                 "{name}.{prop});\n")
+                    else:
+                        code += ("if ({name}._n) {{"
+                                 "  psychoJS.experiment.addData('{name}.{prop}', {name}.{prop}[0])}};\n")
+                    buff.writeIndentedLines(code.format(name=name, prop=property))
+                elif store == 'every frame' or forceEnd == "never":
                     code = ("psychoJS.experiment.addData('%s.%s', %s.%s);\n" %
                             (name, property, name, property))
                     buff.writeIndented(code)
@@ -29,4 +29,4 @@ class CodeGenerationException(Exception):
         self.message = message
 
     def __str__(self):
-        return "{}: ".format(self.source, self.message)
+        return "{}: {}".format(self.source, self.message)
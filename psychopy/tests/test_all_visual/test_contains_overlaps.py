@@ -121,6 +121,10 @@ def test_point():
     assert helpers.pointInPolygon(0, 0, poly1)
     assert helpers.pointInPolygon(12, 12, poly1) is False
     assert helpers.pointInPolygon(0, 0, [(0,0), (1,1)]) is False
+    # inside the bounding box but outside a concave polygon
+    poly3 = [(0,0), (2,0), (2,2), (1,1), (0,2)]
+    assert helpers.pointInPolygon(1, 0.5, poly3)
+    assert not helpers.pointInPolygon(1, 1.5, poly3)
 
     if have_nxutils:
         helpers.nxutils = nxutils
@@ -130,6 +134,10 @@ def test_point():
 
     matplotlib.__version__ = '0.0'  # pure python
     assert helpers.polygonsOverlap(poly1, poly2)
+    # with the vertices in an array, as stimuli have them
+    assert helpers.pointInPolygon(1, 0.5, array(poly3))
+    assert not helpers.pointInPolygon(1, 1.5, array(poly3))
+    assert helpers.pointInPolygon(3, 0.5, array(poly3)) is False
     matplotlib.__version__ = mpl_version
 
 
@@ -99,6 +99,69 @@ class TestExperimentHandler(object):
             contents = f.read()
         assert contents == "mutable,\n[1],\n[9999],\n"
 
+    def test_addDataMany(self):
+        # adding a dict of data at once is the same as adding it item by item
+        exp = data.ExperimentHandler(
+            name='testExp',
+            savePickle=False,
+            saveWideText=False
+            )
+
+        mutant = [1]
+        exp.addDataMany({'mutable': mutant, 'n': len(mutant)})
+        exp.nextEntry()
+        mutant[0] = 9999
+        exp.addDataMany({'mutable': mutant, 'n': len(mutant)})
+        exp.nextEntry()
+        assert exp.dataNames == ['mutable', 'n']
+        assert [entry['mutable'] for entry in exp.entries] == [[1], [9999]]
+
+        # loops pass the data on to the experiment
+        trials = data.TrialHandler2([{}], nReps=2, autoLog=False)
+        exp.addLoop(trials)
+        for trial in trials:
+            trials.addDataMany({'mouse.x': trials.thisN, 'mouse.y': 0})
+            exp.nextEntry()
+        assert exp.dataNames[-2:] == ['mouse.x', 'mouse.y']
+        assert [entry['mouse.x'] for entry in exp.entries[2:]] == [0, 1]
+
+    def test_addDataMany_loops(self):
+        # for the loops Builder uses, adding a dict of data at once stores
+        # the same as adding it item by item (in the loop and the experiment)
+        conditions = [{'ori': 0, 'weight': 2}, {'ori': 90, 'weight': 1}]
+        for loopType in [data.TrialHandler, data.TrialHandlerExt]:
+            results = []
+            for addMany in [False, True]:
+                exp = data.ExperimentHandler(
+                    name='testExp',
+                    savePickle=False,
+                    saveWideText=False
+                    )
+                trials = loopType(conditions, nReps=2, method='sequential',
+                                  autoLog=False)
+                exp.addLoop(trials)
+                for trial in trials:
+                    trialData = {'mouse.x': trials.thisN,
+                                 'mouse.y': [trials.thisN, 0]}
+                    if addMany:
+                        trials.addDataMany(trialData)
+                    else:
+                        for dataName, value in trialData.items():
+                            trials.addData(dataName, value)
+                    exp.nextEntry()
+                results.append((trials, exp))
+            (trials, exp), (manyTrials, manyExp) = results
+            assert sorted(manyTrials.data) == sorted(trials.data)
+            for dataName in trials.data:
+                expected = trials.data[dataName]
+                stored = manyTrials.data[dataName]
+                filled = ~np.ma.getmaskarray(expected)
+                assert stored.shape == expected.shape
+                assert np.array_equal(~np.ma.getmaskarray(stored), filled)
+                assert stored[filled].tolist() == expected[filled].tolist()
+            assert manyExp.dataNames == exp.dataNames
+            assert manyExp.entries == exp.entries
+
     def test_unicode_conditions(self):
         fileName = self.tmpDir + 'unicode_conds'
 
@@ -83,6 +83,10 @@ class _baseTest(object):
                 assert m.units == 'norm'
                 m.setPos((0,0))
                 m.getPos()
+                if w.winType == 'pyglet':
+                    # the pixels given to event handlers convert as getPos
+                    pixPos = w.winHandle._mouse_x, w.winHandle._mouse_y
+                    assert np.allclose(m.eventPosToUnits(*pixPos), m.getPos())
 
     def test_emulated_mouse(self):
         mouse = event.Mouse()  # real mouse
@@ -96,9 +100,16 @@ class _baseTest(object):
         assert all(mouse.getPressed())
         assert all([RT < 0.01 for RT in event.mouseTimes])  # should be < .0001
 
+        # the time of the press was kept
+        pressTime = mouse.getLastPressTime()
+        assert 0 <= core.getTime() - pressTime < 0.01
+        clock = core.Clock()
+        assert mouse.getLastPressTime(clock) == pressTime - clock.getLastResetTime()
+
         # fake release all buttons:
         event._onPygletMouseRelease(0, 0, LEFT | MIDDLE | RIGHT, None, emulated=True)
         assert not any(event.mouseButtons)
+        assert mouse.getLastPressTime() == pressTime
 
     def test_mouse_clock(self):
         x, y = 0, 0
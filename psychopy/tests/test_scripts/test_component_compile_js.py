@@ -1,4 +1,5 @@
 import os
+import io
 import shutil
 from tempfile import mkdtemp
 from psychopy.experiment import getAllComponents, Experiment
@@ -38,6 +39,35 @@ class TestComponentCompilerJS(object):
                     # except IOError as err:
                     #     compareTextFiles('new{}.js'.format(compName), correctPath, tolerance=3)
 
+    def test_mouse_clicked_only(self):
+        """Test the JS for a mouse saving only the clicked stimuli, checking
+        every one under it"""
+        for save, forceEnd in [('final', 'valid click'),
+                               ('on click', 'never'),
+                               ('every frame', 'valid click'),
+                               ('events', 'any click')]:
+            self.reset_experiment('MouseClicked')
+            self.exp.routines['trial'].addComponent(
+                self.allComp['PolygonComponent'](parentName='trial', exp=self.exp))
+            mouse = self.allComp['MouseComponent'](parentName='trial', exp=self.exp)
+            mouse.params['saveMouseState'].val = save
+            mouse.params['forceEndRoutineOnPress'].val = forceEnd
+            mouse.params['clickable'].val = 'polygon'
+            mouse.params['saveMouseColumns'].val = 'clicked'
+            mouse.params['firstHitOnly'].val = False
+            self.exp.routines['trial'].addComponent(mouse)
+            self.create_component_output('MouseClicked')
+            jsFilePath = os.path.join(self.temp_dir, 'newMouseClicked.js')
+            with io.open(jsFilePath, mode='r', encoding='utf-8-sig') as f:
+                script = f.read()
+            # no samples are stored, only the clicked params
+            assert 'mouse._x' not in script
+            assert 'mouse.clicked_name = [];' in script
+            if save != 'final':
+                assert 'mouse.clicked_name.push(obj.name);' in script
+            # and every stimulus under the mouse is checked
+            assert 'break;  // only store the first object clicked' not in script
+
     def reset_experiment(self, compName):
         """Resets the exp object for each component"""
         self.exp = Experiment()  # create once, not every test
@@ -1,9 +1,52 @@
 import os
+import io
 import shutil
+import pytest
 from tempfile import mkdtemp
-from psychopy.experiment import getAllComponents, Experiment
+from psychopy.experiment import getAllComponents, Experiment, CodeGenerationException
 from psychopy.tests.utils import compareTextFiles, TESTS_DATA_PATH
 from psychopy.scripts import psyexpCompile
+from psychopy.experiment.exports import IndentingBuffer
+from psychopy import core, data
+
+
+class _FakeMouse(object):
+    """A mouse for running the code of a MouseComponent without a window,
+    at x = y = (the frame number), with the left button down on odd frames
+    """
+    units = 'height'
+
+    def __init__(self, win=None):
+        self.frameN = 0
+
+    def getPos(self):
+        return self.frameN, self.frameN
+
+    def getPressed(self):
+        return [self.frameN % 2, 0, 0]
+
+    def getLastPressTime(self, clock=None):
+        return None
+
+    def eventPosToUnits(self, x, y):
+        return x, y
+
+
+class _FakeWin(object):
+    """A pyglet window for running the code of a MouseComponent, keeping
+    the mouse event handlers pushed to it
+    """
+    winType = 'pyglet'
+
+    def __init__(self):
+        self.winHandle = self
+        self.handlers = {}
+
+    def push_handlers(self, **handlers):
+        self.handlers.update(handlers)
+
+    def timeOnFlip(self, obj, attrib):
+        pass
 
 
 class TestComponentCompilerPython(object):
@@ -66,6 +109,155 @@ class TestComponentCompilerPython(object):
         pyFilePath = os.path.join(self.temp_dir, 'new{}.py'.format(compName))
         psyexpCompile.compileScript(infile=self.exp, outfile=pyFilePath)
 
+    def test_mouse_events(self):
+        """Test a mouse saving 'events' writes a script that compiles"""
+        script = self.create_mouse_output('MouseEvents', saveMouseState='events')
+        assert 'push_handlers' in script
+        assert 'on_mouse_release=' in script
+        assert '._events.popleft()' in script
+
+    def test_mouse_press_time(self):
+        """Test 'on click' ignores a press time from before the mouse started"""
+        script = self.create_mouse_output('MouseOnClick', saveMouseState='on click',
+                                          newClicksOnly=False)
+        assert 'mouse.getLastPressTime(' in script
+        assert 'if tPress is None or tPress < mouse._tOnset:' in script
+        # the onset is set when the mouse starts, before it is checked
+        assert (script.index('mouse._tOnset = mouse._getTime()') <
+                script.index('if tPress is None or tPress < mouse._tOnset:'))
+
+    def test_mouse_reads_once(self):
+        """Test a mouse checking clickable stimuli reads its position and
+        buttons once for each click"""
+        for save in ['on click', 'every frame']:
+            script = self.create_mouse_output(
+                'MouseReads', saveMouseState=save,
+                forceEndRoutineOnPress='valid click', clickable='polygon')
+            assert script.count('mouse._getPos()') == 1
+            # (and once more as the mouse starts, for newClicksOnly)
+            assert script.count('mouse._getPressed()') == 2
+            assert 'obj.contains(x, y, units=mouse.units)' in script
+
+    def test_mouse_clicked_only(self):
+        """Test a mouse saving only the clicked stimuli, checking every one
+        under it, writes scripts that compile"""
+        for save, forceEnd in [('final', 'valid click'),
+                               ('on click', 'never'),
+                               ('every frame', 'valid click'),
+                               ('events', 'any click')]:
+            script = self.create_mouse_output(
+                'MouseClicked', saveMouseState=save,
+                forceEndRoutineOnPress=forceEnd, clickable='polygon',
+                saveMouseColumns='clicked', firstHitOnly=False)
+            # no samples are stored, only the clicked params
+            assert 'mouse.x.append(' not in script
+            assert 'mouse.time.append(' not in script
+            assert "mouse._clickedLists = {'name': []}" in script
+            assert "mouse.clicked_name" in script
+            # and every stimulus under the mouse is checked
+            assert 'break  # only store the first object clicked' not in script
+
+    def test_mouse_every_frame_samples(self):
+        """Test the code written for a mouse saving every frame stores every
+        sample as a list, over more frames than fit in a first allocation"""
+        nFrames = 300
+        thisExp = self.run_mouse_code(nFrames, saveMouseState='every frame',
+                                      forceEndRoutineOnPress='never', stopVal='')
+        entry = thisExp.entries[0]
+        assert entry['mouse.x'] == list(range(nFrames))
+        assert entry['mouse.leftButton'] == [n % 2 for n in range(nFrames)]
+        assert entry['mouse.midButton'] == [0] * nFrames
+        assert len(entry['mouse.time']) == nFrames
+        for colName in ['x', 'y', 'leftButton', 'midButton', 'rightButton', 'time']:
+            assert type(entry['mouse.' + colName]) is list
+
+    def test_mouse_events_samples(self):
+        """Test the code written for a mouse saving 'events' stores each
+        press and release, with its own position and the buttons down"""
+        def onFrame(frameN, win):
+            if frameN == 10:
+                win.handlers['on_mouse_press'](100, 200, 1, 0)  # left
+                win.handlers['on_mouse_press'](110, 210, 4, 0)  # and right
+            elif frameN == 12:
+                win.handlers['on_mouse_release'](120, 220, 1, 0)
+        thisExp = self.run_mouse_code(20, onFrame=onFrame, saveMouseState='events',
+                                      forceEndRoutineOnPress='never', stopVal='')
+        entry = thisExp.entries[0]
+        assert entry['mouse.x'] == [100, 110, 120]
+        assert entry['mouse.y'] == [200, 210, 220]
+        assert entry['mouse.leftButton'] == [1, 1, 0]
+        assert entry['mouse.rightButton'] == [0, 1, 1]
+        assert len(entry['mouse.time']) == 3
+
+    def run_mouse_code(self, nFrames, onFrame=None, **params):
+        """Run the routine code written for a mouse with the given param
+        values for nFrames frames (with a fake mouse and window), calling
+        onFrame(frameN, win) before each, returning the ExperimentHandler
+        holding the data it saved
+        """
+        self.reset_experiment()
+        mouse = self.allComp['MouseComponent'](parentName='trial', exp=self.exp)
+        for paramName, val in params.items():
+            mouse.params[paramName].val = val
+        self.exp.routines['trial'].addComponent(mouse)
+        code = {}
+        for writeCode in [mouse.writeInitCode, mouse.writeRoutineStartCode,
+                          mouse.writeFrameCode, mouse.writeRoutineEndCode]:
+            buff = IndentingBuffer()
+            writeCode(buff)
+            code[writeCode.__name__] = compile(buff.getvalue(), writeCode.__name__, 'exec')
+        thisExp = data.ExperimentHandler(savePickle=False, saveWideText=False)
+        namespace = dict(event=type('event', (), {'Mouse': _FakeMouse}),
+                         core=core, thisExp=thisExp, win=_FakeWin(),
+                         NOT_STARTED=0, STARTED=1, FINISHED=-1,
+                         frameTolerance=0.001)
+        exec(code['writeInitCode'], namespace)
+        exec(code['writeRoutineStartCode'], namespace)
+        fakeMouse = namespace['mouse']
+        fakeMouse.status = 0
+        fakeMouse.tStart = fakeMouse.tStop = None
+        for frameN in range(nFrames):
+            fakeMouse.frameN = frameN
+            if onFrame:
+                onFrame(frameN, namespace['win'])
+            namespace.update(t=frameN / 60.0, frameN=frameN,
+                             tThisFlipGlobal=frameN / 60.0)
+            exec(code['writeFrameCode'], namespace)
+        exec(code['writeRoutineEndCode'], namespace)
+        return thisExp
+
+    def test_mouse_unknown_data(self):
+        """Test a mouse asked to save unknown data (e.g. a typo) raises an
+        error rather than saving nothing"""
+        with pytest.raises(CodeGenerationException) as err:
+            self.create_mouse_output('MouseUnknown', saveMouseState='on click',
+                                     saveMouseColumns='position, button, time')
+        assert 'position, button' in str(err.value)
+        # the choices can be in any order and need not all be there
+        self.create_mouse_output('MouseKnown', saveMouseState='on click',
+                                 saveMouseColumns='time,pos')
+
+    def create_mouse_output(self, outName, **params):
+        """Create (and compile) the Python script for a mouse with the given
+        param values, returning the script
+        """
+        self.reset_experiment()
+        if params.get('clickable'):
+            # a stimulus to click
+            self.exp.routines['trial'].addComponent(
+                self.allComp['PolygonComponent'](parentName='trial', exp=self.exp,
+                                                 name=params['clickable']))
+        mouse = self.allComp['MouseComponent'](parentName='trial', exp=self.exp)
+        for paramName, val in params.items():
+            mouse.params[paramName].val = val
+        self.exp.routines['trial'].addComponent(mouse)
+        pyFilePath = os.path.join(self.temp_dir, 'new{}.py'.format(outName))
+        psyexpCompile.compileScript(infile=self.exp, outfile=pyFilePath)
+        with io.open(pyFilePath, mode='r', encoding='utf-8-sig') as f:
+            script = f.read()
+        compile(script, pyFilePath, 'exec')
+        return script
+
     def test_component_type_in_experiment(self):
         for compName in self.allComp:
             if compName not in ['SettingsComponent', 'UnknownComponent']:
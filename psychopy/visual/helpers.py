@@ -61,6 +61,16 @@ def pointInPolygon(x, y, poly):
         logging.warning(msg)
         return False
 
+    # points outside the bounding box can be rejected without the full test
+    # (in plain python, quicker than numpy for the few vertices of most stim)
+    if isinstance(poly, np.ndarray):
+        vertices = poly.tolist()
+    else:
+        vertices = poly
+    xs, ys = zip(*vertices)
+    if not (min(xs) <= x <= max(xs) and min(ys) <= y <= max(ys)):
+        return False
+
     # faster if have matplotlib tools:
     if haveMatplotlib:
         if parse_version(matplotlib.__version__) > parse_version('1.2'):
@@ -77,8 +87,8 @@ def pointInPolygon(x, y, poly):
 
     inside = False
     # trace (horizontal?) rays, flip inside status if cross an edge:
-    p1x, p1y = poly[-1]
-    for p2x, p2y in poly:
+    p1x, p1y = vertices[-1]
+    for p2x, p2y in vertices:
         if y > min(p1y, p2y) and y <= max(p1y, p2y) and x <= max(p1x, p2x):
             if p1y != p2y:
                 xints = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x